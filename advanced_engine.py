@@ -1,51 +1,34 @@
-
 import numpy as np
-from PIL import Image, ImageDraw
-import random
-import math
 
-class AdvancedHandwritingEngine:
-    """
-    Advanced handwriting engine with improved letter formation,
-    natural connectivity, and realistic stroke generation
-    """
+from render_context import GLYPH_SCALE
+from renderer import HandwritingRenderer
+
+# Design-grid units to pixels at size 1.0 for this engine's letter set
+ENGINE_GLYPH_SCALE = 0.75
+# Turns sharper than this (as the cosine of the turning angle) stay corners
+CORNER_COS = 0.0
+# Samples per quadratic Bezier arc
+ARC_SAMPLES = 15
 
-    def __init__(self):
-        self.stroke_smoothness = 0.7
-        self.natural_variation = 0.15
-        self.connection_strength = 0.8
 
-    def create_natural_stroke(self, start_point, end_point, control_points=None):
-        """Create a natural-looking stroke between two points"""
-        if control_points is None:
-            # Generate natural control points
-            mid_x = (start_point[0] + end_point[0]) / 2
-            mid_y = (start_point[1] + end_point[1]) / 2
+def quadratic_arcs(starts, controls, ends):
+    """Sample quadratic Bezier arcs given as (A, 2) arrays; returns (A, ARC_SAMPLES, 2)"""
+    t = np.linspace(0, 1, ARC_SAMPLES)[None, :, None]
+    return (1-t)**2 * starts[:, None] + 2*(1-t)*t * controls[:, None] + t**2 * ends[:, None]
 
-            # Add slight curve variation
-            offset_x = random.uniform(-5, 5)
-            offset_y = random.uniform(-3, 3)
-            control_points = [(mid_x + offset_x, mid_y + offset_y)]
 
-        # Generate smooth curve points
-        curve_points = []
-        for t in np.linspace(0, 1, 15):
-            if len(control_points) == 1:
-                # Quadratic Bezier curve
-                cp = control_points[0]
-                x = (1-t)**2 * start_point[0] + 2*(1-t)*t * cp[0] + t**2 * end_point[0]
-                y = (1-t)**2 * start_point[1] + 2*(1-t)*t * cp[1] + t**2 * end_point[1]
-            else:
-                # Linear interpolation fallback
-                x = start_point[0] + t * (end_point[0] - start_point[0])
-                y = start_point[1] + t * (end_point[1] - start_point[1])
+class AdvancedHandwritingEngine(HandwritingRenderer):
+    """
+    Advanced handwriting engine with improved letter formation,
+    natural connectivity, and realistic stroke generation
+    """
 
-            # Add micro-variations for natural look
-            x += random.uniform(-0.5, 0.5)
-            y += random.uniform(-0.5, 0.5)
-            curve_points.append((x, y))
+    label = "Advanced (Bezier strokes)"
 
-        return curve_points
+    def add_micro_variations(self, curve):
+        """Offset sampled curve points slightly along the noise field"""
+        curve = curve + self.noise_field.sample(curve[:, 0] * 0.1, curve[:, 1] * 0.1) * 0.5
+        return [tuple(point) for point in curve.tolist()]
 
     def get_letter_strokes(self, letter):
         """
@@ -181,82 +164,60 @@ class AdvancedHandwritingEngine:
 
         return letter_strokes.get(letter, letter_strokes.get(letter.lower(), []))
 
-    def apply_natural_variations(self, points, variation_intensity=0.15):
-        """Apply natural handwriting variations to points"""
-        varied_points = []
-        for i, (x, y) in enumerate(points):
-            # Reduce variation at stroke endpoints
-            edge_factor = min(i / max(len(points) - 1, 1), 
-                            (len(points) - i) / max(len(points) - 1, 1))
-            edge_factor = min(edge_factor * 2, 1.0)
-
-            variation = variation_intensity * edge_factor
-            x_var = random.uniform(-variation, variation) * 2
-            y_var = random.uniform(-variation, variation) * 2
-
-            varied_points.append((x + x_var, y + y_var))
-
-        return varied_points
-
-    def render_letter(self, draw, letter, base_x, base_y, size_factor=1.0, 
-                     pen_thickness=2, color=(20, 20, 40), slant_angle=0):
-        """Render a single letter with natural variations"""
-        strokes = self.get_letter_strokes(letter)
-
-        if not strokes:
-            return base_x + 24 * size_factor  # Return next x position
-
-        slant_rad = math.radians(slant_angle) if slant_angle else 0
-
-        for stroke in strokes:
-            if len(stroke) < 2:
-                continue
-
-            # Scale and position the stroke
-            scaled_stroke = []
-            for x, y in stroke:
-                new_x = base_x + (x * size_factor * 0.75)
-                new_y = base_y + (y * size_factor * 0.75)
-
-                # Apply slant
-                if slant_rad:
-                    y_offset = (new_x - base_x) * math.tan(slant_rad) * 0.3
-                    new_y += y_offset
-
-                scaled_stroke.append((new_x, new_y))
-
-            # Apply natural variations
-            varied_stroke = self.apply_natural_variations(scaled_stroke)
-
-            # Draw the stroke with anti-aliasing simulation
-            self.draw_natural_stroke(draw, varied_stroke, pen_thickness, color)
-
-        # Return next character position
-        letter_width = 24 * size_factor * 0.85
-        if letter.isupper():
-            letter_width *= 1.2
-
-        return base_x + letter_width
-
-    def draw_natural_stroke(self, draw, points, thickness, color):
-        """Draw a stroke with natural thickness variation"""
-        if len(points) < 2:
-            return
-
-        for i in range(len(points) - 1):
-            x1, y1 = points[i]
-            x2, y2 = points[i + 1]
-
-            # Vary thickness slightly for natural look
-            current_thickness = thickness
-            if random.random() < 0.2:
-                current_thickness += random.choice([-1, 1])
-                current_thickness = max(1, min(current_thickness, thickness + 2))
-
-            # Main stroke
-            draw.line([(x1, y1), (x2, y2)], fill=color, width=current_thickness)
-
-            # Add slight transparency effect by drawing thinner overlapping lines
-            if current_thickness > 1:
-                lighter_color = tuple(min(255, c + 30) for c in color)
-                draw.line([(x1, y1), (x2, y2)], fill=lighter_color, width=max(1, current_thickness - 1))
+    def get_glyph_geometry(self, context, char):
+        """Return cached strokes for a character, scaled and slanted for the context"""
+        # The context's affine is built for the shared glyph scale
+        affine = context.affine * (ENGINE_GLYPH_SCALE / GLYPH_SCALE)
+        return self._cached_glyph_geometry(context, char, lambda: tuple(
+            np.asarray(stroke, dtype=float) @ affine.T
+            for stroke in self.get_letter_strokes(char)
+            if len(stroke) >= 2
+        ))
+
+    def page_strokes(self, placements, context):
+        """Yield the Bezier-smoothed strokes of a page in writing order"""
+        for char, base_x, base_y in placements:
+            for stroke in self.get_glyph_geometry(context, char):
+                points = self.noise_field.jitter(
+                    stroke + (base_x, base_y),
+                    context.jitter_amplitude, context.jitter_frequency
+                )
+                yield self.bezier_stroke(points)
+
+    def bezier_stroke(self, points):
+        """Smooth a polyline with Bezier arcs, keeping its sharp corners
+
+        The polyline is split wherever it turns by more than 90 degrees (the
+        points of 'v', 'w' and 'z') and each piece is smoothed separately.
+        All arcs of the stroke are sampled in one NumPy pass.
+        """
+        points = np.asarray(points, dtype=float)
+        segments = np.diff(points, axis=0)
+        incoming, outgoing = segments[:-1], segments[1:]
+        norm = np.hypot(*incoming.T) * np.hypot(*outgoing.T)
+        dot = (incoming * outgoing).sum(axis=1)
+        sharp = (norm > 0) & (dot < CORNER_COS * norm)
+        corners = [0] + (np.flatnonzero(sharp) + 1).tolist() + [len(points) - 1]
+
+        # Pieces share their corner vertex, so keep it once
+        pieces = [self.bezier_arcs(points[start:end + 1])
+                  for start, end in zip(corners[:-1], corners[1:])]
+        curve = np.concatenate([pieces[0]] + [piece[1:] for piece in pieces[1:]])
+        return self.add_micro_variations(curve)
+
+    def bezier_arcs(self, points):
+        """Sample quadratic Bezier arcs between the segment midpoints of a polyline
+
+        Each interior vertex is the control point of one arc, so turns
+        round off while the end points stay fixed.
+        """
+        if len(points) < 3:
+            starts, ends = points[:1], points[-1:]
+            controls = (starts + ends) / 2
+        else:
+            anchors = np.concatenate((points[:1], (points[1:-2] + points[2:-1]) / 2, points[-1:]))
+            starts, controls, ends = anchors[:-1], points[1:-1], anchors[1:]
+
+        arcs = quadratic_arcs(starts, controls, ends)
+        # Consecutive arcs share an anchor, so keep it once
+        return np.concatenate((arcs[0], arcs[1:, 1:].reshape(-1, 2)))
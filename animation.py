@@ -0,0 +1,188 @@
+"""
+"Being written" animations of generated handwriting
+
+Strokes are walked in writing order and only the newly written segments
+are rasterized for each frame, onto one persistent coverage buffer. Only
+the region those segments touched is re-quantized, so the drawing work is
+linear in the amount of ink rather than in frames x page size.
+
+Pillow's GIF and APNG writers keep every full-page frame in memory, so
+memory does grow with frames x page size. Pages are therefore capped at
+MAX_FRAMES frames: when a page has more ink than that at the requested
+speed, it is written faster instead.
+
+Frames are palette images whose index is the ink coverage, with a palette
+running from the paper colour to the pen colour. That represents the
+anti-aliased page exactly, keeps frames at one byte per pixel, and lets
+Pillow's GIF/APNG writers store each frame as a delta of the previous one.
+Animations always use the distance-field rasterizer.
+"""
+
+import itertools
+import os
+
+import numpy as np
+from PIL import Image
+
+from rasterizer import DistanceFieldRasterizer
+from render_context import compile_style
+
+# Pixels of pen travel drawn per frame
+DEFAULT_SPEED = 150
+DEFAULT_FPS = 20
+# Most frames per page; a 900x650 page at the cap peaks near 150 MB (GIF)
+# and 260 MB (APNG) while encoding
+MAX_FRAMES = 200
+# How long the finished page stays up before a GIF/APNG loops
+HOLD_SECONDS = 2.0
+
+ANIMATION_FORMATS = ("gif", "apng", "frames")
+
+
+def ink_palette(paper_color, pen_color):
+    """Palette where index i is the paper blended with i/255 of the pen colour"""
+    levels = np.arange(256)[:, None] / 255.0
+    colors = np.asarray(paper_color) * (1.0 - levels) + np.asarray(pen_color) * levels
+    return np.rint(colors).astype(np.uint8).ravel().tolist()
+
+
+def iter_frames(generator, placements, width, height, context, speed=DEFAULT_SPEED,
+                max_frames=MAX_FRAMES):
+    """Yield a palette image each time `speed` more pixels of ink are written
+
+    Frames whose pixels would not change are skipped, so consecutive frames
+    always differ. The speed is raised as needed to yield at most
+    `max_frames` frames. The last frame is the finished page.
+    """
+    strokes = []
+    for stroke, radii in generator.plan_page(placements, context):
+        points = np.asarray(stroke, dtype=float)
+        strokes.append((points, radii, np.hypot(*np.diff(points, axis=0).T)))
+    ink = sum(float(lengths.sum()) for _, _, lengths in strokes)
+    # One frame is kept back for the finished page
+    speed = max(speed, ink / max(1, max_frames - 1))
+
+    rasterizer = DistanceFieldRasterizer(width, height)
+    indices = np.zeros((height, width), dtype=np.uint8)
+    palette = ink_palette(generator.paper_color, generator.pen_color)
+    dirty = None
+    travelled = 0.0
+    yielded = False
+
+    def draw(points, radii):
+        nonlocal dirty
+        box = rasterizer.stroke(points, radii)
+        if box is None:
+            return
+        if dirty is None:
+            dirty = box
+        else:
+            dirty = (min(dirty[0], box[0]), min(dirty[1], box[1]),
+                     max(dirty[2], box[2]), max(dirty[3], box[3]))
+
+    def flush():
+        """Re-quantize the touched region; returns whether any pixel changed"""
+        nonlocal dirty
+        if dirty is None:
+            return False
+        x0, y0, x1, y1 = dirty
+        dirty = None
+        region = indices[y0:y1, x0:x1]
+        updated = np.rint(rasterizer.coverage[y0:y1, x0:x1] * 255.0).astype(np.uint8)
+        if np.array_equal(region, updated):
+            return False
+        region[...] = updated
+        return True
+
+    def snapshot():
+        frame = Image.frombytes("P", (width, height), indices.tobytes())
+        frame.putpalette(palette)
+        return frame
+
+    for points, radii, lengths in strokes:
+        # Pieces share their boundary vertex, so the union matches the full stroke
+        start = 0
+        for end, length in enumerate(lengths.tolist(), start=1):
+            travelled += length
+            if travelled >= speed:
+                draw(points[start:end + 1], radii[start:end + 1])
+                start = end
+                travelled = 0.0
+                if flush():
+                    yielded = True
+                    yield snapshot()
+
+        if start < len(points) - 1:
+            draw(points[start:], radii[start:])
+
+    if flush() or not yielded:
+        yield snapshot()
+
+
+def _hold_last(frames, count):
+    """Repeat the final frame; the GIF encoder merges repeats into one long frame"""
+    frame = None
+    for frame in frames:
+        yield frame
+    for _ in range(count):
+        yield frame
+
+
+def export_animation(generator, text, output, width=800, height=600, context=None,
+                     speed=DEFAULT_SPEED, fps=DEFAULT_FPS, page=0, fmt=None):
+    """Write a writing animation of one page and return the number of frames
+
+    `fmt` is "gif", "apng" or "frames" (a directory of numbered PNGs); by
+    default it is inferred from the output path. GIF and APNG can also be
+    written to a file object when `fmt` is given.
+    """
+    if context is None:
+        context = compile_style()
+    if fmt is None:
+        extension = os.path.splitext(output)[1].lower()
+        fmt = {".gif": "gif", ".png": "apng", ".apng": "apng"}.get(extension, "frames")
+    if fmt not in ANIMATION_FORMATS:
+        raise ValueError(f"Unknown animation format: {fmt}")
+
+    pages = generator.layout_pages(text, width, height, context)
+    placements = next(itertools.islice(pages, page, None), [])
+    frames = iter_frames(generator, placements, width, height, context, speed)
+
+    if fmt == "frames":
+        os.makedirs(output, exist_ok=True)
+        count = 0
+        for count, frame in enumerate(frames, start=1):
+            frame.save(os.path.join(output, f"frame_{count:05d}.png"))
+        return count
+
+    frame_ms = round(1000 / fps)
+    if fmt == "apng":
+        # The PNG writer iterates append_images twice, so it needs a real list;
+        # frames are one byte per pixel, so this costs width x height per frame
+        frames = list(frames)
+        durations = [frame_ms] * len(frames)
+        durations[-1] += round(HOLD_SECONDS * 1000)
+        frames[0].save(output, format="PNG", save_all=True, append_images=frames[1:],
+                       duration=durations, loop=0)
+        return len(frames)
+
+    # The GIF writer still keeps every frame, but needs no list of its own
+    counted = 0
+
+    def counting(frames):
+        nonlocal counted
+        for frame in frames:
+            counted += 1
+            yield frame
+
+    frames = counting(frames)
+    first = next(frames)
+    first.save(
+        output,
+        format="GIF",
+        save_all=True,
+        append_images=_hold_last(frames, round(HOLD_SECONDS * fps)),
+        duration=frame_ms,
+        loop=0,
+    )
+    return counted
@@ -1,370 +1,55 @@
-
 import streamlit as st
-import numpy as np
-from PIL import Image, ImageDraw, ImageFont
 import io
-import random
-import math
-import bezier
-
-# Configure the page
-st.set_page_config(
-    page_title="Ultra Accurate Handwriting Converter - Improved",
-    page_icon="✍️",
-    layout="wide"
-)
-
-# Custom CSS for better styling
-st.markdown("""
-<style>
-.main-header {
-    font-size: 3rem;
-    color: #2E86AB;
-    text-align: center;
-    margin-bottom: 2rem;
-}
-.sub-header {
-    font-size: 1.5rem;
-    color: #A23B72;
-    margin-bottom: 1rem;
-}
-.stTextArea textarea {
-    font-family: 'Georgia', serif;
-}
-</style>
-""", unsafe_allow_html=True)
-
-class ImprovedHandwritingGenerator:
-    def __init__(self):
-        self.base_font_size = 32
-        self.line_spacing = 50
-        self.letter_spacing = 2
-        self.word_spacing = 15
-
-    def smooth_curve(self, points, smoothness=0.3):
-        """Create smooth curves between points using bezier-like interpolation"""
-        if len(points) < 3:
-            return points
-
-        smooth_points = []
-        smooth_points.append(points[0])
-
-        for i in range(1, len(points) - 1):
-            prev_point = points[i-1]
-            curr_point = points[i]
-            next_point = points[i+1]
-
-            # Create intermediate points for smoother curves
-            for t in np.linspace(0, 1, 3):
-                if t == 0:
-                    continue
-
-                # Catmull-Rom spline interpolation
-                x = (
-                    smoothness * (next_point[0] - prev_point[0]) * t +
-                    curr_point[0]
-                )
-                y = (
-                    smoothness * (next_point[1] - prev_point[1]) * t +
-                    curr_point[1]
-                )
 
-                smooth_points.append((x, y))
-
-        smooth_points.append(points[-1])
-        return smooth_points
-
-    def add_natural_variations(self, points, variation_factor=0.15):
-        """Add subtle natural handwriting variations"""
-        varied_points = []
-        for i, (x, y) in enumerate(points):
-            # Less variation at start/end of strokes
-            edge_factor = min(i / len(points), (len(points) - i) / len(points), 0.5) * 2
-            current_variation = variation_factor * edge_factor
-
-            x_var = random.uniform(-current_variation, current_variation) * 3
-            y_var = random.uniform(-current_variation, current_variation) * 3
-            varied_points.append((x + x_var, y + y_var))
-        return varied_points
-
-    def create_improved_letter_paths(self, letter, base_x, base_y, size_variation=1.0):
-        """Create more realistic handwritten letter paths with better connectivity"""
-
-        # Improved letter paths with more natural curves and connections
-        paths = {
-            'a': [
-                [(12, 25), (8, 20), (4, 25), (4, 32), (8, 36), (16, 36), (20, 32), (20, 20)],
-                [(20, 20), (20, 36)]
-            ],
-            'b': [
-                [(4, 8), (4, 36)],
-                [(4, 20), (12, 18), (16, 22), (12, 26), (4, 26)],
-                [(4, 26), (14, 26), (18, 30), (18, 32), (14, 36), (4, 36)]
-            ],
-            'c': [
-                [(18, 22), (14, 18), (8, 18), (4, 22), (4, 32), (8, 36), (14, 36), (18, 32)]
-            ],
-            'd': [
-                [(20, 8), (20, 36)],
-                [(20, 20), (16, 18), (10, 18), (6, 22), (6, 32), (10, 36), (16, 36), (20, 32)]
-            ],
-            'e': [
-                [(4, 27), (18, 27), (18, 22), (14, 18), (8, 18), (4, 22), (4, 32), (8, 36), (14, 36), (18, 32)]
-            ],
-            'f': [
-                [(16, 8), (12, 4), (8, 4), (6, 6)],
-                [(8, 4), (8, 36)],
-                [(4, 20), (14, 20)]
-            ],
-            'g': [
-                [(18, 20), (14, 18), (8, 18), (4, 22), (4, 30), (8, 34), (14, 34), (18, 30), (18, 42), (14, 46), (8, 46), (4, 42)]
-            ],
-            'h': [
-                [(4, 8), (4, 36)],
-                [(4, 24), (8, 20), (14, 20), (18, 24), (18, 36)]
-            ],
-            'i': [
-                [(8, 18), (8, 32), (10, 36), (14, 36)],
-                [(8, 12), (8, 14)]
-            ],
-            'j': [
-                [(12, 18), (12, 40), (8, 44), (4, 44), (2, 42)],
-                [(12, 12), (12, 14)]
-            ],
-            'k': [
-                [(4, 8), (4, 36)],
-                [(4, 26), (16, 18)],
-                [(10, 24), (18, 36)]
-            ],
-            'l': [
-                [(8, 8), (8, 32), (10, 36), (14, 36)]
-            ],
-            'm': [
-                [(4, 18), (4, 36)],
-                [(4, 22), (6, 18), (10, 18), (12, 22), (12, 36)],
-                [(12, 22), (14, 18), (18, 18), (20, 22), (20, 36)]
-            ],
-            'n': [
-                [(4, 18), (4, 36)],
-                [(4, 22), (8, 18), (14, 18), (18, 22), (18, 36)]
-            ],
-            'o': [
-                [(4, 22), (4, 32), (8, 36), (14, 36), (18, 32), (18, 22), (14, 18), (8, 18), (4, 22)]
-            ],
-            'p': [
-                [(4, 18), (4, 44)],
-                [(4, 22), (10, 18), (16, 18), (18, 22), (18, 26), (16, 30), (10, 30), (4, 26)]
-            ],
-            'q': [
-                [(18, 18), (18, 44)],
-                [(18, 22), (14, 18), (8, 18), (4, 22), (4, 32), (8, 36), (14, 36), (18, 32)]
-            ],
-            'r': [
-                [(4, 18), (4, 36)],
-                [(4, 22), (8, 18), (12, 18), (14, 20)]
-            ],
-            's': [
-                [(16, 20), (12, 18), (8, 18), (6, 20), (8, 22), (12, 24), (14, 26), (16, 30), (12, 34), (8, 36), (6, 34)]
-            ],
-            't': [
-                [(8, 10), (8, 32), (10, 36), (14, 36)],
-                [(4, 18), (12, 18)]
-            ],
-            'u': [
-                [(4, 18), (4, 30), (8, 36), (14, 36), (18, 30), (18, 18)],
-                [(18, 28), (18, 36)]
-            ],
-            'v': [
-                [(4, 18), (11, 34), (18, 18)]
-            ],
-            'w': [
-                [(2, 18), (7, 34), (11, 26), (15, 34), (20, 18)]
-            ],
-            'x': [
-                [(4, 18), (18, 36)],
-                [(18, 18), (4, 36)]
-            ],
-            'y': [
-                [(4, 18), (11, 30)],
-                [(18, 18), (11, 30), (8, 42), (4, 46), (2, 44)]
-            ],
-            'z': [
-                [(4, 18), (16, 18), (4, 34), (16, 34)]
-            ],
-            # Uppercase letters
-            'A': [
-                [(4, 36), (12, 8), (20, 36)],
-                [(8, 24), (16, 24)]
-            ],
-            'B': [
-                [(4, 8), (4, 36), (14, 36), (18, 32), (18, 28), (14, 24), (4, 24)],
-                [(4, 24), (14, 24), (18, 20), (18, 16), (14, 8), (4, 8)]
-            ],
-            'C': [
-                [(20, 14), (16, 8), (8, 8), (4, 14), (4, 30), (8, 36), (16, 36), (20, 30)]
-            ],
-            'H': [
-                [(4, 8), (4, 36)],
-                [(20, 8), (20, 36)],
-                [(4, 22), (20, 22)]
-            ],
-            'W': [
-                [(2, 8), (6, 36), (12, 20), (18, 36), (22, 8)]
-            ],
-            # Numbers
-            '0': [
-                [(4, 14), (4, 30), (8, 36), (16, 36), (20, 30), (20, 14), (16, 8), (8, 8), (4, 14)]
-            ],
-            '1': [
-                [(8, 10), (12, 8), (12, 36)],
-                [(8, 36), (16, 36)]
-            ],
-            '2': [
-                [(4, 14), (8, 8), (16, 8), (20, 14), (20, 18), (4, 36), (20, 36)]
-            ],
-            # Punctuation
-            '.': [[(8, 32), (8, 36), (12, 36), (12, 32), (8, 32)]],
-            ',': [[(8, 32), (8, 36), (12, 36), (12, 32), (8, 32)], [(10, 36), (8, 42)]],
-            '!': [[(8, 8), (8, 28)], [(8, 32), (8, 36), (12, 36), (12, 32), (8, 32)]],
-            '?': [[(4, 14), (8, 8), (16, 8), (20, 14), (16, 18), (12, 22), (12, 26)], [(12, 32), (12, 36)]],
-            ' ': []
-        }
-
-        if letter not in paths:
-            letter = letter.lower()
-            if letter not in paths:
-                return []
-
-        letter_strokes = paths[letter]
-        if not letter_strokes:
-            return []
-
-        all_points = []
-        for stroke in letter_strokes:
-            if not stroke:
-                continue
-
-            # Scale and position the stroke
-            scaled_stroke = []
-            for x, y in stroke:
-                new_x = base_x + (x * size_variation * 0.8)
-                new_y = base_y + (y * size_variation * 0.8)
-                scaled_stroke.append((new_x, new_y))
-
-            # Add natural variations and smooth the stroke
-            if len(scaled_stroke) > 1:
-                varied_stroke = self.add_natural_variations(scaled_stroke)
-                smooth_stroke = self.smooth_curve(varied_stroke)
-                all_points.extend(smooth_stroke)
-                all_points.append(None)  # Stroke separator
-
-        return all_points
-
-    def generate_handwriting(self, text, width=800, height=600, 
-                           pen_thickness=2, slant_angle=0, 
-                           size_variation=1.0, roughness=0.3,
-                           line_height=1.5):
-        """Generate improved handwritten text"""
-
-        # Create blank image with slight off-white background
-        bg_color = (255, 255, 252)  # Slightly warm white
-        img = Image.new('RGB', (width, height), bg_color)
-        draw = ImageDraw.Draw(img)
-
-        # Starting position
-        current_x = 40
-        current_y = 60
-        max_line_height = self.base_font_size * size_variation * line_height
-
-        words = text.replace('\n', ' \n ').split()
-
-        for word in words:
-            if word == '\n':
-                current_y += max_line_height
-                current_x = 40
-                continue
-
-            word_width = len(word) * (24 * size_variation)
-
-            # Line wrapping
-            if current_x + word_width > width - 60:
-                current_y += max_line_height
-                current_x = 40
-
-            # Process each character in the word
-            for char_idx, char in enumerate(word):
-                if char == ' ':
-                    current_x += self.word_spacing * size_variation
-                    continue
-
-                # Get letter path
-                letter_points = self.create_improved_letter_paths(
-                    char, current_x, current_y, size_variation
-                )
+from animation import export_animation
+from canvas_pool import CanvasPool
+from config import DEFAULT_SETTINGS, WRITING_STYLES
+from engines import ENGINES
+from render_cache import RenderCache, document_key, page_key
+from render_context import compile_style
 
-                if letter_points:
-                    # Draw each stroke
-                    current_stroke = []
-                    pen_color = (20, 20, 40)  # Dark blue-black
-
-                    for point in letter_points:
-                        if point is None:  # End of stroke
-                            if len(current_stroke) > 1:
-                                self.draw_smooth_stroke(
-                                    draw, current_stroke, pen_thickness, 
-                                    pen_color, slant_angle, current_x
-                                )
-                            current_stroke = []
-                        else:
-                            current_stroke.append(point)
-
-                    # Draw final stroke if exists
-                    if len(current_stroke) > 1:
-                        self.draw_smooth_stroke(
-                            draw, current_stroke, pen_thickness, 
-                            pen_color, slant_angle, current_x
-                        )
 
-                # Move to next character position
-                char_width = 24 * size_variation
-                if char.isupper():
-                    char_width *= 1.2
-                current_x += char_width + (self.letter_spacing * size_variation)
-
-            # Add word spacing
-            current_x += self.word_spacing * size_variation * 0.7
-
-        return img
-
-    def draw_smooth_stroke(self, draw, points, thickness, color, slant_angle, base_x):
-        """Draw a smooth stroke with consistent thickness"""
-        if len(points) < 2:
-            return
-
-        # Apply slant transformation
-        if slant_angle != 0:
-            slant_rad = math.radians(slant_angle)
-            slanted_points = []
-            for x, y in points:
-                y_offset = (x - base_x) * math.tan(slant_rad) * 0.3
-                slanted_points.append((x, y + y_offset))
-            points = slanted_points
-
-        # Draw the stroke with multiple overlapping lines for smoothness
-        for i in range(len(points) - 1):
-            x1, y1 = points[i]
-            x2, y2 = points[i + 1]
-
-            # Main stroke
-            draw.line([(x1, y1), (x2, y2)], fill=color, width=thickness)
-
-            # Add slight thickness variation for more natural look
-            if random.random() < 0.3:
-                thickness_var = thickness + random.choice([-1, 1])
-                thickness_var = max(1, thickness_var)
-                draw.line([(x1, y1), (x2, y2)], fill=color, width=thickness_var)
+@st.cache_resource
+def get_render_cache():
+    """One on-disk render cache per server process, shared by every session
+
+    A single instance sees every write the server makes, so the size cap
+    is enforced even when each session only renders a few pages.
+    """
+    try:
+        return RenderCache()
+    except OSError:
+        return None
+
 
 def main():
+    # Configure the page
+    st.set_page_config(
+        page_title="Ultra Accurate Handwriting Converter - Improved",
+        page_icon="✍️",
+        layout="wide"
+    )
+
+    # Custom CSS for better styling
+    st.markdown("""
+    <style>
+    .main-header {
+        font-size: 3rem;
+        color: #2E86AB;
+        text-align: center;
+        margin-bottom: 2rem;
+    }
+    .sub-header {
+        font-size: 1.5rem;
+        color: #A23B72;
+        margin-bottom: 1rem;
+    }
+    .stTextArea textarea {
+        font-family: 'Georgia', serif;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
     st.markdown('<h1 class="main-header">✍️ Ultra Accurate Handwriting Converter - Improved</h1>', unsafe_allow_html=True)
 
     st.markdown("""
@@ -375,8 +60,15 @@ def main():
     </div>
     """, unsafe_allow_html=True)
 
-    # Initialize the handwriting generator
-    generator = ImprovedHandwritingGenerator()
+    # Per-session generators (one per engine) and canvas pool so reruns
+    # reuse cached glyph geometry and page buffers
+    if "generators" not in st.session_state:
+        st.session_state.generators = {}
+    if "canvas_pool" not in st.session_state:
+        st.session_state.canvas_pool = CanvasPool()
+    # The on-disk render cache is shared with other sessions and batch runs
+    pool = st.session_state.canvas_pool
+    render_cache = get_render_cache()
 
     # Sidebar for controls
     with st.sidebar:
@@ -396,45 +88,38 @@ def main():
         st.markdown("**Quick Styles**")
         style_preset = st.selectbox(
             "Choose a style preset:",
-            ["Custom", "Clean & Neat", "Casual Writing", "Elegant Script", "Quick Notes"]
+            [None] + list(WRITING_STYLES),
+            format_func=lambda key: "Custom" if key is None else WRITING_STYLES[key]["name"]
         )
 
-        # Style presets
-        if style_preset == "Clean & Neat":
-            pen_thickness = 2
-            size_variation = 0.9
-            slant_angle = 0
-            roughness = 0.2
-            line_height = 1.6
-        elif style_preset == "Casual Writing":
-            pen_thickness = 2
-            size_variation = 1.0
-            slant_angle = 3
-            roughness = 0.3
-            line_height = 1.5
-        elif style_preset == "Elegant Script":
-            pen_thickness = 2
-            size_variation = 1.1
-            slant_angle = 8
-            roughness = 0.25
-            line_height = 1.7
-        elif style_preset == "Quick Notes":
-            pen_thickness = 3
-            size_variation = 0.8
-            slant_angle = -2
-            roughness = 0.4
-            line_height = 1.4
-        else:  # Custom
+        # Style presets are compiled once and cached
+        if style_preset is None:
             st.markdown("**Custom Settings**")
-            pen_thickness = st.slider("Pen Thickness", 1, 4, 2)
-            size_variation = st.slider("Letter Size", 0.7, 1.4, 1.0, 0.1)
-            slant_angle = st.slider("Slant Angle", -15, 15, 0)
-            roughness = st.slider("Writing Variation", 0.1, 0.5, 0.3, 0.05)
-            line_height = st.slider("Line Spacing", 1.2, 2.0, 1.5, 0.1)
+            context = compile_style(
+                pen_thickness=st.slider("Pen Thickness", 1, 4, 2),
+                size_variation=st.slider("Letter Size", 0.7, 1.4, 1.0, 0.1),
+                slant_angle=st.slider("Slant Angle", -15, 15, 0),
+                roughness=st.slider("Writing Variation", 0.1, 0.5, 0.3, 0.05),
+                line_height=st.slider("Line Spacing", 1.2, 2.0, 1.5, 0.1)
+            )
+        else:
+            context = compile_style(style_preset)
+            st.caption(WRITING_STYLES[style_preset]["description"])
+
+        engine = st.selectbox(
+            "Rendering engine:",
+            list(ENGINES),
+            format_func=lambda key: ENGINES[key].label
+        )
+        generators = st.session_state.generators
+        if engine not in generators:
+            generators[engine] = ENGINES[engine](seed=DEFAULT_SETTINGS["seed"])
+        generator = generators[engine]
 
         st.markdown("**Paper Settings**")
         paper_width = st.slider("Paper Width", 600, 1200, 900, 50)
         paper_height = st.slider("Paper Height", 400, 800, 650, 50)
+        animate = st.checkbox("🎬 Also create a writing animation (GIF)")
 
         # Generate button
         generate_btn = st.button("🖊️ Generate Improved Handwriting", type="primary")
@@ -446,33 +131,60 @@ def main():
         if generate_btn and input_text:
             with st.spinner("Generating beautiful handwritten text..."):
                 try:
-                    # Generate the handwriting
-                    handwritten_img = generator.generate_handwriting(
-                        text=input_text,
-                        width=paper_width,
-                        height=paper_height,
-                        pen_thickness=pen_thickness,
-                        slant_angle=slant_angle,
-                        size_variation=size_variation,
-                        roughness=roughness,
-                        line_height=line_height
-                    )
+                    cache_key = None
+                    byte_im = None
+                    if render_cache is not None:
+                        doc_key = document_key(generator, input_text, paper_width,
+                                               paper_height, context)
+                        if doc_key is not None:
+                            cache_key = page_key(doc_key, 0)
+                            byte_im = render_cache.get(cache_key)
+
+                    if byte_im is None:
+                        # Generate the handwriting
+                        handwritten_img = generator.generate_handwriting(
+                            text=input_text,
+                            width=paper_width,
+                            height=paper_height,
+                            context=context,
+                            pool=pool
+                        )
+
+                        # Encode once; the same bytes feed both the preview and the download
+                        buf = io.BytesIO()
+                        dpi = DEFAULT_SETTINGS["dpi"]
+                        handwritten_img.save(buf, format='PNG', dpi=(dpi, dpi))
+                        pool.release(handwritten_img)
+                        byte_im = buf.getvalue()
+                        del buf, handwritten_img
+                        if cache_key is not None:
+                            render_cache.put(cache_key, byte_im)
 
                     # Display the result
                     st.markdown('<h3 class="sub-header">📝 Your Beautiful Handwriting</h3>', unsafe_allow_html=True)
-                    st.image(handwritten_img, caption="Generated handwritten text", use_column_width=True)
+                    st.image(byte_im, caption="Generated handwritten text", use_column_width=True)
 
                     # Download option
-                    buf = io.BytesIO()
-                    handwritten_img.save(buf, format='PNG', quality=95, dpi=(300, 300))
-                    byte_im = buf.getvalue()
-
                     st.download_button(
                         label="📥 Download High-Quality Image",
                         data=byte_im,
                         file_name="beautiful_handwriting.png",
                         mime="image/png"
                     )
+                    if render_cache is not None:
+                        st.caption(f"Render cache hit rate since the server started: {render_cache.hit_rate:.0%}")
+
+                    if animate:
+                        gif_buf = io.BytesIO()
+                        export_animation(generator, input_text, gif_buf, paper_width,
+                                         paper_height, context, fmt="gif")
+                        st.image(gif_buf.getvalue(), caption="Writing animation", use_column_width=True)
+                        st.download_button(
+                            label="🎬 Download Writing Animation",
+                            data=gif_buf.getvalue(),
+                            file_name="handwriting_animation.gif",
+                            mime="image/gif"
+                        )
 
                 except Exception as e:
                     st.error(f"Error generating handwriting: {str(e)}")
@@ -481,7 +193,22 @@ def main():
         elif not input_text:
             st.info("👈 Please enter some text in the sidebar to generate handwriting!")
         else:
-            st.info("👈 Click the 'Generate Improved Handwriting' button to see the results!")
+            # Fast draft preview while the sliders are being adjusted
+            try:
+                preview_img = generator.generate_handwriting(
+                    text=input_text,
+                    width=paper_width,
+                    height=paper_height,
+                    context=context,
+                    quality="draft",
+                    pool=pool
+                )
+                st.markdown('<h3 class="sub-header">👀 Live Preview</h3>', unsafe_allow_html=True)
+                st.image(preview_img, caption="Draft preview - same line breaks as the final image", use_column_width=True)
+                pool.release(preview_img)
+            except Exception as e:
+                st.error(f"Error generating preview: {str(e)}")
+            st.info("👈 Click the 'Generate Improved Handwriting' button for the full-quality image and download!")
 
     with col2:
         st.markdown('<h3 class="sub-header">✨ New Improvements</h3>', unsafe_allow_html=True)
@@ -0,0 +1,162 @@
+"""
+Batch converter: render text files to handwritten PNG pages
+
+Usage:
+    python batch.py notes.txt letter.txt --output-dir out --style casual
+    python batch.py thesis.txt --workers 8
+    python batch.py note.txt --animate gif --speed 100
+    python batch.py note.txt --engine advanced
+"""
+
+import argparse
+import io
+import os
+from contextlib import nullcontext
+
+from animation import ANIMATION_FORMATS, DEFAULT_FPS, DEFAULT_SPEED, export_animation
+from canvas_pool import CanvasPool
+from config import DEFAULT_SETTINGS, WRITING_STYLES
+from engines import ENGINES
+from parallel import generate_pages_parallel, worker_pool
+from render_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, RenderCache, document_key, page_key
+from render_context import compile_style
+
+
+def encode_page(page):
+    """PNG bytes of a page at the configured DPI"""
+    buf = io.BytesIO()
+    page.save(buf, format="PNG", dpi=(DEFAULT_SETTINGS["dpi"], DEFAULT_SETTINGS["dpi"]))
+    return buf.getvalue()
+
+
+def cached_document(cache, doc_key, page_count):
+    """Encoded pages of a document if every one is cached, else None"""
+    pages = []
+    for page in range(page_count):
+        data = cache.get(page_key(doc_key, page))
+        if data is None:
+            return None
+        pages.append(data)
+    return pages
+
+
+def convert_file(generator, path, output_dir, context, width, height, pool, workers=1,
+                 cache=None, procs=None):
+    """Render every page of one text file, returning the written paths
+
+    With more than one worker, the pages of the file are rasterized in
+    parallel, on `procs` from parallel.worker_pool when given; output is
+    identical to the serial render. With a RenderCache,
+    a file whose pages are all cached is written without rendering, and
+    freshly rendered pages are added to the cache.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+
+    def write_page(page_number, data):
+        out_path = os.path.join(output_dir, f"{stem}_page{page_number:03d}.png")
+        with open(out_path, "wb") as f:
+            f.write(data)
+        return out_path
+
+    doc_key = None
+    if cache is not None:
+        doc_key = document_key(generator, text, width, height, context)
+    if doc_key is not None:
+        page_count = sum(1 for _ in generator.layout_pages(text, width, height, context))
+        encoded = cached_document(cache, doc_key, page_count)
+        if encoded is not None:
+            return [write_page(n, data) for n, data in enumerate(encoded, start=1)]
+
+    render_kwargs = dict(width=width, height=height, context=context, pool=pool)
+    if workers > 1:
+        pages = generate_pages_parallel(generator, text, workers=workers, procs=procs,
+                                        **render_kwargs)
+    else:
+        pages = generator.generate_pages(text, **render_kwargs)
+
+    written = []
+    for page_number, page in enumerate(pages, start=1):
+        data = encode_page(page)
+        pool.release(page)
+        written.append(write_page(page_number, data))
+        if doc_key is not None:
+            cache.put(page_key(doc_key, page_number - 1), data)
+
+    return written
+
+
+def animate_file(generator, path, output_dir, context, width, height, fmt, speed, fps):
+    """Write a writing animation of the first page of one text file"""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    name = {"gif": f"{stem}_writing.gif", "apng": f"{stem}_writing.png"}.get(fmt, f"{stem}_frames")
+    out_path = os.path.join(output_dir, name)
+    frames = export_animation(generator, text, out_path, width, height, context,
+                              speed=speed, fps=fps, fmt=fmt)
+    return out_path, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert text files to handwriting pages")
+    parser.add_argument("inputs", nargs="+", help="Text files to convert")
+    parser.add_argument("--output-dir", default="handwriting_output")
+    parser.add_argument("--style", choices=sorted(WRITING_STYLES), default="clean_neat")
+    parser.add_argument("--width", type=int, default=DEFAULT_SETTINGS["paper_width"])
+    parser.add_argument("--height", type=int, default=DEFAULT_SETTINGS["paper_height"])
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="improved",
+                        help="Handwriting engine that plans the strokes")
+    parser.add_argument("--backend", choices=["pillow", "sdf"], default="sdf",
+                        help="Stroke rasterizer: Pillow lines or anti-aliased distance field")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes used to render the pages of each file (sdf backend)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SETTINGS["seed"],
+                        help="Seed for reproducible output")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Directory of the render cache shared with the app")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Render cache size cap in MB")
+    parser.add_argument("--no-cache", action="store_true", help="Always render every page")
+    parser.add_argument("--animate", choices=ANIMATION_FORMATS,
+                        help="Also export the first page being written as an animation")
+    parser.add_argument("--speed", type=float, default=DEFAULT_SPEED,
+                        help="Animation writing speed in pixels of ink per frame")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS, help="Animation frame rate")
+    args = parser.parse_args()
+    if args.workers > 1 and args.backend != "sdf":
+        parser.error("--workers requires --backend sdf")
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    generator = ENGINES[args.engine](seed=args.seed, stroke_backend=args.backend)
+    pool = CanvasPool()
+    context = compile_style(args.style)
+    cache = None
+    if not args.no_cache:
+        cache = RenderCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+    # Worker processes are started once and shared by every input file
+    workers = worker_pool(generator, args.workers) if args.workers > 1 else nullcontext()
+    with workers as procs:
+        for path in args.inputs:
+            written = convert_file(generator, path, args.output_dir, context,
+                                   args.width, args.height, pool, args.workers, cache, procs)
+            print(f"{path}: {len(written)} page(s) -> {args.output_dir}")
+            if args.animate:
+                out_path, frames = animate_file(generator, path, args.output_dir, context,
+                                                args.width, args.height, args.animate,
+                                                args.speed, args.fps)
+                print(f"{path}: {frames} frame(s) -> {out_path}")
+
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Render cache: {stats['hits']} hit(s), {stats['misses']} miss(es) "
+              f"({stats['hit_rate']:.0%}), {stats['bytes_read']} bytes read, "
+              f"{stats['bytes_written']} bytes written, {stats['evictions']} evicted")
+
+
+if __name__ == "__main__":
+    main()
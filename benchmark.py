@@ -0,0 +1,198 @@
+"""
+Benchmarks for the Ultra Accurate Handwriting Converter
+
+Usage:
+    python benchmark.py draft [--repeat N]
+    python benchmark.py sessions [--sessions 1 10 50]
+    python benchmark.py raster [--repeat N] [--save-dir DIR]
+    python benchmark.py parallel [--pages N] [--workers N]
+    python benchmark.py engines [--repeat N] [--engines improved advanced] [--save-dir DIR]
+"""
+
+import argparse
+import io
+import itertools
+import multiprocessing
+import os
+import resource
+import time
+
+import numpy as np
+
+from canvas_pool import CanvasPool
+from engines import ENGINES, ImprovedHandwritingGenerator
+from parallel import generate_pages_parallel
+from render_context import compile_style
+
+# Roughly one full page of text at the default paper size
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "business_formal.txt"),
+          encoding="utf-8") as f:
+    SAMPLE_TEXT = f.read() * 2
+
+
+def time_call(func, repeat):
+    """Return the best wall time in milliseconds over `repeat` runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def bench_draft(args):
+    """Compare draft preview and final render times for a full page"""
+    generator = ImprovedHandwritingGenerator()
+
+    for width, height in [(900, 650), (1200, 800)]:
+        for quality in ["draft", "final"]:
+            ms = time_call(
+                lambda: generator.generate_handwriting(
+                    SAMPLE_TEXT, width=width, height=height, quality=quality
+                ),
+                args.repeat
+            )
+            target = "  (target < 50 ms)" if quality == "draft" else ""
+            print(f"{width}x{height} {quality:>5}: {ms:8.1f} ms{target}")
+
+
+def simulate_sessions(count, renders):
+    """Peak RSS in MB for `count` live sessions, each keeping its last render"""
+    generator = ImprovedHandwritingGenerator()
+    sessions = [{"canvas_pool": CanvasPool()} for _ in range(count)]
+
+    for _ in range(renders):
+        for session in sessions:
+            pool = session["canvas_pool"]
+            preview = generator.generate_handwriting(SAMPLE_TEXT, 900, 650, quality="draft", pool=pool)
+            pool.release(preview)
+
+            page = generator.generate_handwriting(SAMPLE_TEXT, 900, 650, pool=pool)
+            buf = io.BytesIO()
+            page.save(buf, format="PNG", dpi=(300, 300))
+            pool.release(page)
+            session["png_bytes"] = buf.getvalue()
+
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_sessions(args):
+    """Peak RSS for several concurrent sessions, each measured in a fresh process"""
+    ctx = multiprocessing.get_context("spawn")
+    for count in args.sessions:
+        with ctx.Pool(1) as worker:
+            peak_mb = worker.apply(simulate_sessions, (count, args.renders))
+        print(f"{count:3d} session(s): peak RSS {peak_mb:7.1f} MB")
+
+
+def bench_raster(args):
+    """Compare the Pillow and distance-field stroke backends on the same page"""
+    images = {}
+    for backend in ["pillow", "sdf"]:
+        generator = ImprovedHandwritingGenerator(seed=0, stroke_backend=backend)
+        ms = time_call(lambda: generator.generate_handwriting(SAMPLE_TEXT, 900, 650), args.repeat)
+        images[backend] = generator.generate_handwriting(SAMPLE_TEXT, 900, 650)
+        print(f"{backend:>6}: {ms:8.1f} ms per page")
+
+    # Output comparison on darkness (0 = paper, 1 = full ink)
+    ink = {
+        backend: 1.0 - np.asarray(img.convert("L"), dtype=np.float32) / 255.0
+        for backend, img in images.items()
+    }
+    partial = np.mean((ink["sdf"] > 0.05) & (ink["sdf"] < 0.95))
+    print(f"ink pillow {ink['pillow'].sum():10.0f}  sdf {ink['sdf'].sum():10.0f}")
+    print(f"mean abs difference {np.abs(ink['pillow'] - ink['sdf']).mean():.4f}, "
+          f"anti-aliased edge pixels (sdf) {partial:.2%}")
+
+    if args.save_dir:
+        os.makedirs(args.save_dir, exist_ok=True)
+        for backend, img in images.items():
+            img.save(os.path.join(args.save_dir, f"raster_{backend}.png"))
+
+
+def bench_parallel(args):
+    """Serial vs shared-memory parallel rendering of one long document"""
+    text = SAMPLE_TEXT * (args.pages // 2 + 1)
+
+    start = time.perf_counter()
+    pages = ImprovedHandwritingGenerator(seed=0).generate_pages(text, 900, 650)
+    serial = [page.tobytes() for page in itertools.islice(pages, args.pages)]
+    serial_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pages = generate_pages_parallel(ImprovedHandwritingGenerator(seed=0), text, 900, 650,
+                                    workers=args.workers)
+    parallel = [page.tobytes() for page in itertools.islice(pages, args.pages)]
+    pages.close()
+    parallel_s = time.perf_counter() - start
+
+    print(f"{len(serial)} pages  serial {serial_s:6.2f} s  "
+          f"parallel ({args.workers or multiprocessing.cpu_count()} workers) {parallel_s:6.2f} s")
+    print(f"byte-identical: {serial == parallel}")
+
+
+def bench_engines(args):
+    """Time each stage of every engine's renderer pipeline on the same page"""
+    context = compile_style()
+    for name in args.engines:
+        generator = ENGINES[name](seed=0)
+        placements = next(generator.layout_pages(SAMPLE_TEXT, 900, 650, context))
+        plan = generator.plan_page(placements, context)
+
+        layout_ms = time_call(
+            lambda: next(generator.layout_pages(SAMPLE_TEXT, 900, 650, context)), args.repeat
+        )
+        plan_ms = time_call(lambda: generator.plan_page(placements, context), args.repeat)
+        raster_ms = time_call(lambda: generator.rasterize(plan, 900, 650), args.repeat)
+        draft_ms = time_call(
+            lambda: generator.render_draft(placements, 900, 650, context), args.repeat
+        )
+
+        page = generator.rasterize(plan, 900, 650)
+        ink = (1.0 - np.asarray(page.convert("L"), dtype=np.float32) / 255.0).sum()
+        points = sum(len(points) for points, _ in plan)
+        print(f"{name:>8}: layout {layout_ms:6.1f} ms  plan {plan_ms:6.1f} ms  "
+              f"rasterize {raster_ms:6.1f} ms  draft {draft_ms:6.1f} ms  "
+              f"({len(plan)} strokes, {points} points, ink {ink:.0f})")
+
+        if args.save_dir:
+            os.makedirs(args.save_dir, exist_ok=True)
+            page.save(os.path.join(args.save_dir, f"engine_{name}.png"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Handwriting converter benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    draft_parser = subparsers.add_parser("draft", help="Draft preview vs final render")
+    draft_parser.add_argument("--repeat", type=int, default=5)
+    draft_parser.set_defaults(func=bench_draft)
+
+    sessions_parser = subparsers.add_parser("sessions", help="Peak memory per concurrent session count")
+    sessions_parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50])
+    sessions_parser.add_argument("--renders", type=int, default=3, help="Renders per session")
+    sessions_parser.set_defaults(func=bench_sessions)
+
+    raster_parser = subparsers.add_parser("raster", help="Pillow vs distance-field stroke backend")
+    raster_parser.add_argument("--repeat", type=int, default=5)
+    raster_parser.add_argument("--save-dir", help="Write both renders here for visual comparison")
+    raster_parser.set_defaults(func=bench_raster)
+
+    parallel_parser = subparsers.add_parser("parallel", help="Serial vs parallel page rendering")
+    parallel_parser.add_argument("--pages", type=int, default=40)
+    parallel_parser.add_argument("--workers", type=int)
+    parallel_parser.set_defaults(func=bench_parallel)
+
+    engines_parser = subparsers.add_parser("engines", help="Per-stage timings of each engine")
+    engines_parser.add_argument("--repeat", type=int, default=5)
+    engines_parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=list(ENGINES))
+    engines_parser.add_argument("--save-dir", help="Write each engine's page here for visual comparison")
+    engines_parser.set_defaults(func=bench_engines)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
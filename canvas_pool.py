@@ -0,0 +1,55 @@
+"""
+Reusable page canvases for the handwriting renderers
+
+Allocating a fresh full-size image for every render (and every page of a
+long document) is wasteful. A CanvasPool keeps released canvases around and
+clears them with a single fill when they are handed out again. The memory
+held by idle canvases is capped so one session cannot grow without bound.
+"""
+
+from PIL import Image
+
+BYTES_PER_PIXEL = {"L": 1, "RGB": 3, "RGBA": 4}
+
+
+def canvas_nbytes(img):
+    """Approximate size of an image's pixel buffer in bytes"""
+    return img.width * img.height * BYTES_PER_PIXEL.get(img.mode, 4)
+
+
+class CanvasPool:
+    """Pool of blank page images, keyed by mode and size"""
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.pooled_bytes = 0
+        self.allocations = 0
+        self.reuses = 0
+        self._free = {}
+
+    def acquire(self, size, color, mode="RGB"):
+        """Return a canvas of the given size filled with `color`"""
+        free = self._free.get((mode, size))
+        if free:
+            img = free.pop()
+            self.pooled_bytes -= canvas_nbytes(img)
+            self.reuses += 1
+            img.paste(color, (0, 0) + size)
+            return img
+
+        self.allocations += 1
+        return Image.new(mode, size, color)
+
+    def release(self, img):
+        """Hand a canvas back for reuse; dropped if the pool is full"""
+        nbytes = canvas_nbytes(img)
+        if self.pooled_bytes + nbytes > self.max_bytes:
+            return
+
+        self._free.setdefault((img.mode, img.size), []).append(img)
+        self.pooled_bytes += nbytes
+
+    def clear(self):
+        """Drop every idle canvas"""
+        self._free.clear()
+        self.pooled_bytes = 0
@@ -9,6 +9,7 @@ DEFAULT_SETTINGS = {
     "paper_height": 650,
     "paper_color": (255, 255, 252),  # Warm white
     "dpi": 300,  # High quality output
+    "seed": 1234,  # Fixed so identical requests render identically and hit the render cache
 
     # Handwriting style - more realistic defaults
     "pen_thickness": 2,
@@ -18,6 +19,7 @@ DEFAULT_SETTINGS = {
     "line_height": 1.5,
 
     # Enhanced spacing settings
+    "base_font_size": 32,
     "line_spacing": 50,
     "letter_spacing": 2,
     "word_spacing": 15,
@@ -0,0 +1,15 @@
+"""
+Registry of the handwriting engines
+
+Kept apart from app.py so command-line tools can choose an engine without
+importing Streamlit.
+"""
+
+from advanced_engine import AdvancedHandwritingEngine
+from improved_engine import ImprovedHandwritingGenerator
+
+# Engines selectable from the UI and the command-line tools
+ENGINES = {
+    "improved": ImprovedHandwritingGenerator,
+    "advanced": AdvancedHandwritingEngine,
+}
@@ -0,0 +1,150 @@
+"""
+Glyph stroke definitions for the handwriting generator
+
+Each character maps to a list of strokes; each stroke is a list of (x, y)
+points on a 24 x 48 design grid with the baseline at y = 36. Bump
+GLYPH_PACK_VERSION whenever these paths change so cached renders made with
+the old shapes are not reused.
+"""
+
+GLYPH_PACK_VERSION = 1
+
+# Improved letter paths with more natural curves and connections
+LETTER_PATHS = {
+    'a': [
+        [(12, 25), (8, 20), (4, 25), (4, 32), (8, 36), (16, 36), (20, 32), (20, 20)],
+        [(20, 20), (20, 36)]
+    ],
+    'b': [
+        [(4, 8), (4, 36)],
+        [(4, 20), (12, 18), (16, 22), (12, 26), (4, 26)],
+        [(4, 26), (14, 26), (18, 30), (18, 32), (14, 36), (4, 36)]
+    ],
+    'c': [
+        [(18, 22), (14, 18), (8, 18), (4, 22), (4, 32), (8, 36), (14, 36), (18, 32)]
+    ],
+    'd': [
+        [(20, 8), (20, 36)],
+        [(20, 20), (16, 18), (10, 18), (6, 22), (6, 32), (10, 36), (16, 36), (20, 32)]
+    ],
+    'e': [
+        [(4, 27), (18, 27), (18, 22), (14, 18), (8, 18), (4, 22), (4, 32), (8, 36), (14, 36), (18, 32)]
+    ],
+    'f': [
+        [(16, 8), (12, 4), (8, 4), (6, 6)],
+        [(8, 4), (8, 36)],
+        [(4, 20), (14, 20)]
+    ],
+    'g': [
+        [(18, 20), (14, 18), (8, 18), (4, 22), (4, 30), (8, 34), (14, 34), (18, 30), (18, 42), (14, 46), (8, 46), (4, 42)]
+    ],
+    'h': [
+        [(4, 8), (4, 36)],
+        [(4, 24), (8, 20), (14, 20), (18, 24), (18, 36)]
+    ],
+    'i': [
+        [(8, 18), (8, 32), (10, 36), (14, 36)],
+        [(8, 12), (8, 14)]
+    ],
+    'j': [
+        [(12, 18), (12, 40), (8, 44), (4, 44), (2, 42)],
+        [(12, 12), (12, 14)]
+    ],
+    'k': [
+        [(4, 8), (4, 36)],
+        [(4, 26), (16, 18)],
+        [(10, 24), (18, 36)]
+    ],
+    'l': [
+        [(8, 8), (8, 32), (10, 36), (14, 36)]
+    ],
+    'm': [
+        [(4, 18), (4, 36)],
+        [(4, 22), (6, 18), (10, 18), (12, 22), (12, 36)],
+        [(12, 22), (14, 18), (18, 18), (20, 22), (20, 36)]
+    ],
+    'n': [
+        [(4, 18), (4, 36)],
+        [(4, 22), (8, 18), (14, 18), (18, 22), (18, 36)]
+    ],
+    'o': [
+        [(4, 22), (4, 32), (8, 36), (14, 36), (18, 32), (18, 22), (14, 18), (8, 18), (4, 22)]
+    ],
+    'p': [
+        [(4, 18), (4, 44)],
+        [(4, 22), (10, 18), (16, 18), (18, 22), (18, 26), (16, 30), (10, 30), (4, 26)]
+    ],
+    'q': [
+        [(18, 18), (18, 44)],
+        [(18, 22), (14, 18), (8, 18), (4, 22), (4, 32), (8, 36), (14, 36), (18, 32)]
+    ],
+    'r': [
+        [(4, 18), (4, 36)],
+        [(4, 22), (8, 18), (12, 18), (14, 20)]
+    ],
+    's': [
+        [(16, 20), (12, 18), (8, 18), (6, 20), (8, 22), (12, 24), (14, 26), (16, 30), (12, 34), (8, 36), (6, 34)]
+    ],
+    't': [
+        [(8, 10), (8, 32), (10, 36), (14, 36)],
+        [(4, 18), (12, 18)]
+    ],
+    'u': [
+        [(4, 18), (4, 30), (8, 36), (14, 36), (18, 30), (18, 18)],
+        [(18, 28), (18, 36)]
+    ],
+    'v': [
+        [(4, 18), (11, 34), (18, 18)]
+    ],
+    'w': [
+        [(2, 18), (7, 34), (11, 26), (15, 34), (20, 18)]
+    ],
+    'x': [
+        [(4, 18), (18, 36)],
+        [(18, 18), (4, 36)]
+    ],
+    'y': [
+        [(4, 18), (11, 30)],
+        [(18, 18), (11, 30), (8, 42), (4, 46), (2, 44)]
+    ],
+    'z': [
+        [(4, 18), (16, 18), (4, 34), (16, 34)]
+    ],
+    # Uppercase letters
+    'A': [
+        [(4, 36), (12, 8), (20, 36)],
+        [(8, 24), (16, 24)]
+    ],
+    'B': [
+        [(4, 8), (4, 36), (14, 36), (18, 32), (18, 28), (14, 24), (4, 24)],
+        [(4, 24), (14, 24), (18, 20), (18, 16), (14, 8), (4, 8)]
+    ],
+    'C': [
+        [(20, 14), (16, 8), (8, 8), (4, 14), (4, 30), (8, 36), (16, 36), (20, 30)]
+    ],
+    'H': [
+        [(4, 8), (4, 36)],
+        [(20, 8), (20, 36)],
+        [(4, 22), (20, 22)]
+    ],
+    'W': [
+        [(2, 8), (6, 36), (12, 20), (18, 36), (22, 8)]
+    ],
+    # Numbers
+    '0': [
+        [(4, 14), (4, 30), (8, 36), (16, 36), (20, 30), (20, 14), (16, 8), (8, 8), (4, 14)]
+    ],
+    '1': [
+        [(8, 10), (12, 8), (12, 36)],
+        [(8, 36), (16, 36)]
+    ],
+    '2': [
+        [(4, 14), (8, 8), (16, 8), (20, 14), (20, 18), (4, 36), (20, 36)]
+    ],
+    # Punctuation
+    '.': [[(8, 32), (8, 36), (12, 36), (12, 32), (8, 32)]],
+    ',': [[(8, 32), (8, 36), (12, 36), (12, 32), (8, 32)], [(10, 36), (8, 42)]],
+    '!': [[(8, 8), (8, 28)], [(8, 32), (8, 36), (12, 36), (12, 32), (8, 32)]],
+    '?': [[(4, 14), (8, 8), (16, 8), (20, 14), (16, 18), (12, 22), (12, 26)], [(12, 32), (12, 36)]],
+    ' ': []
+}
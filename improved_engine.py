@@ -0,0 +1,67 @@
+"""
+Default handwriting engine
+
+Draws the LETTER_PATHS glyphs, already scaled and slanted by the render
+context, with noise-field jitter and Catmull-Rom style smoothing.
+"""
+
+import numpy as np
+
+from renderer import HandwritingRenderer
+
+
+class ImprovedHandwritingGenerator(HandwritingRenderer):
+    """Renders the LETTER_PATHS glyphs with Catmull-Rom smoothed strokes"""
+
+    label = "Improved (smoothed strokes)"
+
+    def smooth_curve(self, points, smoothness=0.3):
+        """Create smooth curves between points using bezier-like interpolation"""
+        if len(points) < 3:
+            return points
+
+        smooth_points = []
+        smooth_points.append(points[0])
+
+        for i in range(1, len(points) - 1):
+            prev_point = points[i-1]
+            curr_point = points[i]
+            next_point = points[i+1]
+
+            # Create intermediate points for smoother curves
+            for t in np.linspace(0, 1, 3):
+                if t == 0:
+                    continue
+
+                # Catmull-Rom spline interpolation
+                x = (
+                    smoothness * (next_point[0] - prev_point[0]) * t +
+                    curr_point[0]
+                )
+                y = (
+                    smoothness * (next_point[1] - prev_point[1]) * t +
+                    curr_point[1]
+                )
+
+                smooth_points.append((x, y))
+
+        smooth_points.append(points[-1])
+        return smooth_points
+
+    def get_glyph_geometry(self, context, char):
+        """Return cached, smoothed strokes for a character, without jitter"""
+        return self._cached_glyph_geometry(context, char, lambda: tuple(
+            tuple(self.smooth_curve([tuple(point) for point in stroke.tolist()]))
+            for stroke in context.strokes(char)
+        ))
+
+    def page_strokes(self, placements, context):
+        """Yield the final points of every stroke on a page in writing order"""
+        for char, base_x, base_y in placements:
+            for stroke in context.strokes(char):
+                # Glyph geometry is already scaled and slanted by the context
+                points = self.noise_field.jitter(
+                    stroke + (base_x, base_y),
+                    context.jitter_amplitude, context.jitter_frequency
+                )
+                yield self.smooth_curve([tuple(point) for point in points.tolist()])
@@ -0,0 +1,139 @@
+"""
+Parallel rendering of a single large document
+
+Layout runs once in the parent. Each page's placements are sent to a
+process pool whose workers rasterize stroke coverage straight into a
+multiprocessing.shared_memory buffer, so no Image objects are pickled
+back. The parent composites finished buffers onto pooled canvases and
+yields pages in order as soon as each is ready. A fixed ring of buffers
+bounds memory no matter how many pages the document has.
+
+The output is byte-identical to the engine's own generate_pages with the
+same seed: jitter comes from the seeded noise field, pressure is
+deterministic, and both paths run the same rasterizer and composite.
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from rasterizer import DistanceFieldRasterizer
+from render_context import compile_style
+
+# Generator copy used by each worker process, set by _init_worker
+_worker_generator = None
+
+
+def _init_worker(generator):
+    global _worker_generator
+    _worker_generator = generator
+
+
+def _coverage_view(slot, width, height):
+    return np.ndarray((height, width), dtype=np.float32, buffer=slot.buf)
+
+
+def _rasterize_page(slot_name, placements, width, height, context):
+    """Worker task: draw one page's coverage into a shared-memory slot"""
+    slot = shared_memory.SharedMemory(name=slot_name)
+    try:
+        coverage = _coverage_view(slot, width, height)
+        coverage.fill(0.0)
+        _worker_generator.draw_page(DistanceFieldRasterizer(width, height, coverage),
+                                    placements, context)
+        del coverage
+    finally:
+        slot.close()
+
+
+def worker_pool(generator, workers=None):
+    """Start a process pool that can render pages for `generator`
+
+    Starting workers is expensive, so callers rendering several documents
+    with the same generator create one pool and pass it to each
+    generate_pages_parallel call. Use it as a context manager.
+    """
+    # spawn rather than fork, so the batch and benchmark workers start from a
+    # clean interpreter on every platform instead of inheriting locks held by
+    # the parent's threads (numpy's thread pool, for one)
+    ctx = multiprocessing.get_context("spawn")
+    return ctx.Pool(workers or os.cpu_count() or 1,
+                    initializer=_init_worker, initargs=(generator,))
+
+
+def generate_pages_parallel(generator, text, width=800, height=600,
+                            pen_thickness=2, slant_angle=0,
+                            size_variation=1.0, roughness=0.3,
+                            line_height=1.5, pool=None, context=None, workers=None,
+                            procs=None):
+    """Yield full-quality pages in order, rasterized across worker processes
+
+    Takes the same arguments as generate_pages, plus the number of worker
+    processes (defaults to the CPU count). `procs` is a pool from
+    worker_pool for the same generator and number of workers; without one,
+    a pool is started for this document. Requires the "sdf" backend.
+    """
+    if generator.stroke_backend != "sdf":
+        raise ValueError("Parallel rendering requires the 'sdf' stroke backend")
+
+    if context is None:
+        context = compile_style(pen_thickness=pen_thickness, slant_angle=slant_angle,
+                                size_variation=size_variation, roughness=roughness,
+                                line_height=line_height)
+
+    workers = workers or os.cpu_count() or 1
+    layouts = generator.layout_pages(text, width, height, context)
+    own_procs = procs is None
+
+    # Two buffers per worker keeps every worker busy while the parent composites
+    slot_bytes = width * height * np.dtype(np.float32).itemsize
+    slots = [shared_memory.SharedMemory(create=True, size=slot_bytes)
+             for _ in range(workers * 2)]
+
+    free = list(slots)
+    pending = deque()
+
+    def submit():
+        placements = next(layouts, None)
+        if placements is None:
+            return False
+        slot = free.pop()
+        result = procs.apply_async(
+            _rasterize_page, (slot.name, placements, width, height, context)
+        )
+        pending.append((slot, result))
+        return True
+
+    try:
+        if own_procs:
+            procs = worker_pool(generator, workers)
+        while free and submit():
+            pass
+
+        while pending:
+            slot, result = pending.popleft()
+            result.get()
+
+            img = generator._new_canvas((width, height), pool)
+            coverage = _coverage_view(slot, width, height)
+            DistanceFieldRasterizer(width, height, coverage).composite(img, generator.pen_color)
+            del coverage
+
+            free.append(slot)
+            submit()
+            yield img
+    finally:
+        if own_procs:
+            if procs is not None:
+                procs.terminate()
+        else:
+            # A shared pool outlives this document, so let tasks still
+            # writing into the slots finish before they are unlinked
+            for _, result in pending:
+                result.wait()
+        for slot in slots:
+            slot.close()
+            slot.unlink()
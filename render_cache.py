@@ -0,0 +1,243 @@
+"""
+Content-addressed on-disk render cache
+
+Encoded pages are stored under a hash of everything that affects the
+output: the normalized text, paper size, resolved style settings, seed,
+engine and glyph-pack versions. Identical requests are then served from
+disk across restarts and by every process sharing the cache directory.
+
+Entries are written to a temporary file and moved into place with
+os.replace, so readers in other processes only ever see complete files.
+Reading an entry bumps its mtime, and once the directory grows past its
+size cap the least recently used entries are deleted. The directory is
+scanned when a cache is opened, after every tenth of the cap written, and
+at least once a minute while writing, so writes from other processes are
+accounted for even when this one writes little.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+from config import DEFAULT_SETTINGS
+from glyphs import GLYPH_PACK_VERSION
+from render_context import style_settings
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "HANDWRITING_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "handwriting")
+)
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Eviction trims to this fraction of the cap so it doesn't run on every write
+EVICT_TO = 0.9
+# Seconds between directory scans while writing, to see other processes' writes
+RESCAN_SECONDS = 60
+# Temporary files older than this were left behind by a crashed writer
+STALE_TEMP_SECONDS = 3600
+
+ENTRY_SUFFIX = ".png"
+TEMP_PREFIX = ".tmp-"
+
+
+def normalize_text(text):
+    """Canonical form of the text as the layout sees it
+
+    Layout only uses the words and the newlines between them, so runs of
+    other whitespace collapse to a single space.
+    """
+    return "\n".join(" ".join(re.findall(r"[^\s]+", line)) for line in text.split("\n"))
+
+
+def document_key(generator, text, width, height, context, dpi=DEFAULT_SETTINGS["dpi"]):
+    """Hash of every input that affects a document's rendered pages
+
+    Returns None for unseeded generators, whose output is random by design.
+    """
+    if generator.seed is None:
+        return None
+    parts = {
+        "text": normalize_text(text),
+        "width": width,
+        "height": height,
+        "style": style_settings(context.preset, context.overrides),
+        "seed": generator.seed,
+        "engine": type(generator).__name__,
+        "engine_version": generator.ENGINE_VERSION,
+        "glyph_pack": GLYPH_PACK_VERSION,
+        "backend": generator.stroke_backend,
+        "pressure": generator.pressure_simulation,
+        "paper_color": generator.paper_color,
+        "pen_color": generator.pen_color,
+        "dpi": dpi,
+    }
+    encoded = json.dumps(parts, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def page_key(doc_key, page):
+    """Key of one zero-based page of a document"""
+    return f"{doc_key}-{page:05d}"
+
+
+class RenderCache:
+    """Size-capped, multi-process safe store of encoded pages"""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        # Counters for this process only
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        # Bytes this instance has written since it last scanned the directory
+        self._written_since_check = 0
+        self._last_check = time.monotonic()
+        # One instance may be shared by threads (e.g. the Streamlit server)
+        self._check_lock = threading.Lock()
+
+        # Other processes may have filled the cache while this one was not running
+        self.evict()
+
+    def _path(self, key):
+        # Fan out over subdirectories so no single directory gets huge
+        return os.path.join(self.directory, key[:2], key + ENTRY_SUFFIX)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key):
+        """Return the stored bytes for a key, or None on a miss
+
+        Unreadable entries count as misses, so cache I/O errors never fail
+        a render.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted by another process since we read it
+        self.hits += 1
+        self.bytes_read += len(data)
+        return data
+
+    def put(self, key, data):
+        """Store bytes under a key; returns False if the write failed
+
+        The cache is best effort, so I/O errors are swallowed rather than
+        failing the render that produced the data.
+        """
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=directory)
+        except OSError:
+            return False
+
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            return False
+
+        with self._check_lock:
+            self.bytes_written += len(data)
+            self._written_since_check += len(data)
+            # Scanning the directory is the only view of other processes' writes,
+            # so do it once this instance has written enough to matter, or
+            # periodically in case others have
+            scan = (self._written_since_check >= self.max_bytes * (1.0 - EVICT_TO)
+                    or time.monotonic() - self._last_check >= RESCAN_SECONDS)
+            if scan:
+                self._written_since_check = 0
+                self._last_check = time.monotonic()
+        if scan:
+            self.evict()
+        return True
+
+    def _entries(self):
+        """(mtime, size, path) of every entry, removing stale temporary files"""
+        entries = []
+        now = time.time()
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if name.startswith(TEMP_PREFIX):
+                    if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                        self._remove(path)
+                    continue
+                if name.endswith(ENTRY_SUFFIX):
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        return True
+
+    def size(self):
+        """Total bytes currently stored by all processes"""
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits its cap"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+
+        target = self.max_bytes * EVICT_TO
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            # Another process may have evicted it already; either way it's gone
+            if self._remove(path):
+                self.evictions += 1
+                self.evicted_bytes += size
+            total -= size
+
+    def clear(self):
+        """Delete every entry"""
+        for _, _, path in self._entries():
+            self._remove(path)
+
+    def stats(self):
+        """Counters for this process, plus the hit rate"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
@@ -0,0 +1,153 @@
+"""
+Compiled style presets
+
+A RenderContext holds everything a render derives from the style settings:
+glyph geometry already scaled and slanted by one affine matrix, advance
+widths, line metrics and jitter parameters. Contexts are immutable and
+cached by preset and overrides, so switching between presets costs nothing
+after the first use of each.
+"""
+
+import functools
+import math
+from dataclasses import dataclass
+from types import MappingProxyType
+
+import numpy as np
+
+from config import DEFAULT_SETTINGS, WRITING_STYLES
+from glyphs import LETTER_PATHS
+from noise_field import roughness_to_jitter
+
+STYLE_KEYS = (
+    "pen_thickness", "size_variation", "slant_angle", "roughness", "line_height",
+    "base_font_size", "letter_spacing", "word_spacing",
+)
+
+# Design-grid units to pixels at size_variation 1.0
+GLYPH_SCALE = 0.8
+# Nominal advance of one character in design units; capitals are wider
+BASE_ADVANCE = 24
+UPPERCASE_ADVANCE = 1.2
+# Fraction of the slant tangent applied per pixel of horizontal offset
+SLANT_FACTOR = 0.3
+
+
+@dataclass(frozen=True, eq=False)
+class RenderContext:
+    """Prepared, immutable render settings for one style"""
+
+    preset: object
+    overrides: tuple
+    pen_thickness: int
+    size_variation: float
+    slant_angle: float
+    roughness: float
+    line_height: float
+    affine: np.ndarray
+    glyphs: MappingProxyType
+    advance_widths: MappingProxyType
+    default_advance: float
+    uppercase_advance: float
+    max_advance: float
+    word_width_per_char: float
+    word_gap: float
+    line_advance: float
+    jitter_amplitude: float
+    jitter_frequency: float
+
+    def strokes(self, char):
+        """Transformed strokes for a character, falling back to lowercase"""
+        strokes = self.glyphs.get(char)
+        if strokes is None:
+            strokes = self.glyphs.get(char.lower(), ())
+        return strokes
+
+    def advance(self, char):
+        """Horizontal pen advance after drawing a character"""
+        width = self.advance_widths.get(char)
+        if width is None:
+            width = self.uppercase_advance if char.isupper() else self.default_advance
+        return width
+
+    def __reduce__(self):
+        # Pickle by name so worker processes recompile (and cache) their own copy
+        return _compile, (self.preset, self.overrides)
+
+
+def compile_style(preset=None, **overrides):
+    """Return the cached RenderContext for a WRITING_STYLES key plus overrides
+
+    Overrides set to None are ignored, so callers can pass optional slider
+    values straight through.
+    """
+    overrides = tuple(sorted((k, v) for k, v in overrides.items() if v is not None))
+    return _compile(preset, overrides)
+
+
+def style_settings(preset, overrides):
+    """Resolve a preset plus sorted (key, value) overrides to every STYLE_KEYS value"""
+    settings = {key: DEFAULT_SETTINGS[key] for key in STYLE_KEYS}
+    if preset is not None:
+        style = WRITING_STYLES[preset]
+        settings.update((key, style[key]) for key in STYLE_KEYS if key in style)
+    for key, value in overrides:
+        if key not in STYLE_KEYS:
+            raise ValueError(f"Unknown style setting: {key}")
+        settings[key] = value
+    return settings
+
+
+@functools.lru_cache(maxsize=64)
+def _compile(preset, overrides):
+    settings = style_settings(preset, overrides)
+
+    size = settings["size_variation"]
+    scale = size * GLYPH_SCALE
+    shear = math.tan(math.radians(settings["slant_angle"])) * SLANT_FACTOR
+
+    # Scale, then push each point down in proportion to its x offset
+    affine = np.array([[scale, 0.0], [scale * shear, scale]])
+    affine.flags.writeable = False
+
+    glyphs = {}
+    for char, strokes in LETTER_PATHS.items():
+        transformed = []
+        for stroke in strokes:
+            if len(stroke) < 2:
+                continue
+            points = np.asarray(stroke, dtype=float) @ affine.T
+            points.flags.writeable = False
+            transformed.append(points)
+        glyphs[char] = tuple(transformed)
+
+    spacing = settings["letter_spacing"] * size
+    default_advance = BASE_ADVANCE * size + spacing
+    uppercase_advance = BASE_ADVANCE * size * UPPERCASE_ADVANCE + spacing
+    advance_widths = {
+        char: uppercase_advance if char.isupper() else default_advance
+        for char in LETTER_PATHS
+    }
+
+    amplitude, frequency = roughness_to_jitter(settings["roughness"])
+
+    return RenderContext(
+        preset=preset,
+        overrides=overrides,
+        pen_thickness=settings["pen_thickness"],
+        size_variation=size,
+        slant_angle=settings["slant_angle"],
+        roughness=settings["roughness"],
+        line_height=settings["line_height"],
+        affine=affine,
+        glyphs=MappingProxyType(glyphs),
+        advance_widths=MappingProxyType(advance_widths),
+        default_advance=default_advance,
+        uppercase_advance=uppercase_advance,
+        max_advance=uppercase_advance,
+        word_width_per_char=BASE_ADVANCE * size,
+        word_gap=settings["word_spacing"] * size * 0.7,
+        line_advance=settings["base_font_size"] * size * settings["line_height"],
+        jitter_amplitude=amplitude,
+        jitter_frequency=frequency,
+    )
@@ -0,0 +1,267 @@
+"""
+Common renderer protocol shared by the handwriting engines
+
+Every engine renders a document in three stages:
+
+    layout_pages(text, width, height, context)  -> (char, x, y) placements per page
+    plan_page(placements, context)               -> [(points, radii), ...] strokes
+    rasterize(plan, width, height, pool)         -> page image
+
+Layout and rasterization are shared, so engines only differ in the stroke
+geometry they plan for each placed character (page_strokes) and in the
+un-jittered glyph geometry used for draft previews (get_glyph_geometry).
+Anything written against this interface (the app, batch converter,
+parallel renderer, animation export, benchmarks) works with any engine.
+"""
+
+import re
+from abc import ABC, abstractmethod
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from config import DEFAULT_SETTINGS
+from noise_field import NoiseField
+from pressure import stroke_radii
+from rasterizer import DistanceFieldRasterizer
+from render_context import compile_style
+
+# Cached glyph geometries kept per engine before the cache is reset
+GLYPH_CACHE_LIMIT = 4096
+
+
+class HandwritingRenderer(ABC):
+    """Base class for engines: shared layout, planning and rasterization"""
+
+    # Bump whenever a change alters rendered output, so cached pages are not reused
+    ENGINE_VERSION = 2
+
+    def __init__(self, seed=None, stroke_backend="sdf",
+                 pressure_simulation=DEFAULT_SETTINGS["pressure_simulation"]):
+        self.draft_scale = 0.5
+        self.paper_color = (255, 255, 252)  # Slightly warm white
+        self.pen_color = (20, 20, 40)  # Dark blue-black
+
+        # "pillow" draws with ImageDraw.line, "sdf" with the anti-aliased
+        # distance-field rasterizer
+        self.stroke_backend = stroke_backend
+        self.pressure_simulation = pressure_simulation
+        self._glyph_cache = {}
+
+        # Same seed -> same jitter
+        self.seed = seed
+        self.noise_field = NoiseField(seed)
+
+    def layout_pages(self, text, width, height, context):
+        """Lay out text page by page, yielding a list of (char, x, y) per page.
+
+        Draft and final renders share this layout so the preview always has
+        the same line breaks as the full-quality image. Pages are produced
+        lazily, so rendering only the first page does not lay out the rest.
+        Pages with nothing to draw (only blank lines or characters without
+        glyphs) are skipped, but a document always has at least one page.
+        """
+        placements = []
+        page_emitted = False
+
+        # Starting position
+        current_x = 40
+        current_y = 60
+        max_line_height = context.line_advance
+
+        for word in self._layout_tokens(text, width, context):
+            if word == '\n':
+                new_line = True
+            else:
+                # Line wrapping
+                word_width = len(word) * context.word_width_per_char
+                new_line = current_x + word_width > width - 60
+
+            if new_line:
+                current_y += max_line_height
+                current_x = 40
+
+                # Page break once the next line no longer fits
+                if current_y + max_line_height > height:
+                    if self._has_ink(placements, context):
+                        yield placements
+                        page_emitted = True
+                    placements = []
+                    current_y = 60
+
+            if word == '\n':
+                continue
+
+            # Place each character in the word
+            for char in word:
+                placements.append((char, current_x, current_y))
+                current_x += context.advance(char)
+
+            # Add word spacing
+            current_x += context.word_gap
+
+        if not page_emitted or self._has_ink(placements, context):
+            yield placements
+
+    def _has_ink(self, placements, context):
+        """Whether any placed character has strokes to draw"""
+        return any(self.get_glyph_geometry(context, char) for char, _, _ in placements)
+
+    def _layout_tokens(self, text, width, context):
+        """Yield words and newlines lazily, splitting words too long for one line"""
+        max_chars = max(1, int((width - 100) // context.max_advance))
+
+        for match in re.finditer(r'\n|[^\s]+', text):
+            word = match.group()
+            if len(word) <= max_chars:
+                yield word
+            else:
+                for start in range(0, len(word), max_chars):
+                    yield word[start:start + max_chars]
+
+    @abstractmethod
+    def page_strokes(self, placements, context):
+        """Yield the final points of every stroke on a page in writing order"""
+
+    @abstractmethod
+    def get_glyph_geometry(self, context, char):
+        """Return cached strokes for a character, without jitter, for drafts"""
+
+    def _cached_glyph_geometry(self, context, char, build):
+        """Return build() for a character, cached by the context's glyph transform
+
+        Glyph geometry depends only on the affine, so contexts that differ
+        only in thickness, roughness or spacing share entries.
+        """
+        key = (context.affine.tobytes(), char)
+        geometry = self._glyph_cache.get(key)
+        if geometry is None:
+            if len(self._glyph_cache) >= GLYPH_CACHE_LIMIT:
+                self._glyph_cache.clear()
+            geometry = self._glyph_cache[key] = build()
+        return geometry
+
+    def pen_radii(self, points, thickness):
+        """Per-vertex outline radii, following simulated pen pressure when enabled"""
+        if self.pressure_simulation:
+            return stroke_radii(points, thickness)
+        return np.full(len(points), thickness / 2)
+
+    def plan_page(self, placements, context):
+        """Return the (points, radii) of every stroke on a page in writing order"""
+        plan = []
+        for stroke in self.page_strokes(placements, context):
+            if len(stroke) < 2:
+                continue
+            plan.append((stroke, self.pen_radii(stroke, context.pen_thickness)))
+        return plan
+
+    def rasterize(self, plan, width, height, pool=None):
+        """Render a stroke plan onto a blank page with the configured backend"""
+        img = self._new_canvas((width, height), pool)
+
+        if self.stroke_backend == "sdf":
+            rasterizer = DistanceFieldRasterizer(width, height)
+            self.draw_plan(rasterizer, plan)
+            rasterizer.composite(img, self.pen_color)
+        else:
+            self.draw_plan(ImageDraw.Draw(img), plan)
+
+        return img
+
+    def draw_plan(self, draw, plan):
+        """Draw planned strokes onto an ImageDraw or rasterizer"""
+        for points, radii in plan:
+            self.draw_stroke(draw, points, radii, self.pen_color)
+
+    def draw_page(self, draw, placements, context):
+        """Draw every glyph of a laid-out page onto an ImageDraw or rasterizer"""
+        self.draw_plan(draw, self.plan_page(placements, context))
+
+    def draw_stroke(self, draw, points, radii, color):
+        """Draw one stroke in a single pass
+
+        `draw` is either an ImageDraw or a DistanceFieldRasterizer; only the
+        latter renders a pressure profile as a true variable-width outline.
+        """
+        if isinstance(draw, DistanceFieldRasterizer):
+            draw.stroke(points, radii)
+            return
+
+        if not self.pressure_simulation:
+            width = max(1, int(round(radii[0] * 2)))
+            draw.line(points, fill=color, width=width, joint="curve")
+            return
+
+        # Pillow lines have a fixed integer width, so approximate per segment
+        widths = np.maximum(1, np.rint(radii[:-1] + radii[1:])).astype(int).tolist()
+        for i, width in enumerate(widths):
+            draw.line([points[i], points[i + 1]], fill=color, width=width)
+
+    def render_page(self, placements, width, height, context, pool=None):
+        """Render one laid-out page at full quality"""
+        return self.rasterize(self.plan_page(placements, context), width, height, pool)
+
+    def render_draft(self, placements, width, height, context, pool=None):
+        """Render a reduced-resolution preview from cached glyph geometry.
+
+        Skips natural variations and pressure, and draws each stroke as a
+        single fixed-width Pillow polyline.
+        """
+        scale = self.draft_scale
+        img = self._new_canvas((max(1, int(width * scale)), max(1, int(height * scale))), pool)
+        draw = ImageDraw.Draw(img)
+        stroke_width = max(1, round(context.pen_thickness * scale))
+
+        for char, base_x, base_y in placements:
+            for stroke in self.get_glyph_geometry(context, char):
+                draw.line(
+                    [((base_x + x) * scale, (base_y + y) * scale) for x, y in stroke],
+                    fill=self.pen_color, width=stroke_width
+                )
+
+        return img
+
+    def generate_handwriting(self, text, width=800, height=600,
+                             pen_thickness=2, slant_angle=0,
+                             size_variation=1.0, roughness=0.3,
+                             line_height=1.5, quality="final", pool=None,
+                             context=None):
+        """Generate handwritten text for the first page
+
+        quality="draft" renders a fast, reduced-resolution preview of the same
+        layout; quality="final" renders the full-quality image. A compiled
+        RenderContext, when given, replaces the individual style arguments.
+        """
+        if context is None:
+            context = compile_style(pen_thickness=pen_thickness, slant_angle=slant_angle,
+                                    size_variation=size_variation, roughness=roughness,
+                                    line_height=line_height)
+        placements = next(self.layout_pages(text, width, height, context))
+
+        if quality == "draft":
+            return self.render_draft(placements, width, height, context, pool)
+
+        return self.render_page(placements, width, height, context, pool)
+
+    def generate_pages(self, text, width=800, height=600,
+                       pen_thickness=2, slant_angle=0,
+                       size_variation=1.0, roughness=0.3,
+                       line_height=1.5, pool=None, context=None):
+        """Yield one full-quality image per page of text.
+
+        When a CanvasPool is given, release each page back to it once it has
+        been saved so the next page reuses the same buffer.
+        """
+        if context is None:
+            context = compile_style(pen_thickness=pen_thickness, slant_angle=slant_angle,
+                                    size_variation=size_variation, roughness=roughness,
+                                    line_height=line_height)
+        for placements in self.layout_pages(text, width, height, context):
+            yield self.render_page(placements, width, height, context, pool)
+
+    def _new_canvas(self, size, pool=None):
+        """Blank page in the paper colour, reused from the pool when possible"""
+        if pool is not None:
+            return pool.acquire(size, self.paper_color)
+        return Image.new('RGB', size, self.paper_color)
@@ -0,0 +1,234 @@
+"""
+Stress harness for large and pathological documents
+
+Feeds inputs from 1 KB to 10 MB through the first-page path
+(generate_handwriting), the full-document path (generate_pages) and the
+AdvancedHandwritingEngine's full-document path, recording wall time, peak
+memory (tracemalloc and RSS) and encoded output size. Each run happens in
+a fresh process so RSS numbers are not polluted by earlier runs.
+
+The default sweep stops at 100 KB, the smallest that fits a scaling
+exponent, and takes about ten minutes. The full sweep up to 10 MB renders
+tens of thousands of pages per case and takes hours, so it only runs with
+--full.
+
+Usage:
+    python stress.py [--max-size 100KB] [--cases prose giant_word] [--paths document]
+    python stress.py --full
+
+Exits with status 1 if any path/case grows worse than linearly with input
+size, or if its peak memory is not bounded per page.
+"""
+
+import argparse
+import io
+import math
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+
+from canvas_pool import CanvasPool
+from engines import ENGINES, ImprovedHandwritingGenerator
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+DEFAULT_MAX_SIZE = 100_000
+DEFAULT_TRACE_LIMIT = 10_000
+# Fixed per-run overhead dominates the smallest inputs, so fit from here up
+FIT_MIN_SIZE = 10_000
+SAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "business_formal.txt")
+CASES = ["prose", "long_lines", "giant_word", "newlines", "unsupported"]
+PATHS = ["first_page", "document", "engine"]
+
+WIDTH = 900
+HEIGHT = 650
+SETTINGS = {
+    "pen_thickness": 2,
+    "slant_angle": 3,
+    "size_variation": 1.0,
+    "roughness": 0.3,
+    "line_height": 1.5,
+}
+
+# Failure thresholds
+MAX_SCALING_EXPONENT = 1.2        # log-log slope of time vs input size
+MAX_MEMORY_GROWTH = 2.0           # largest peak vs smallest peak
+MEMORY_SLACK_BYTES = 16 * 1024 * 1024
+
+
+def parse_size(value):
+    """Parse sizes such as 500, 10KB or 1MB into bytes"""
+    units = {"KB": 1_000, "MB": 1_000_000}
+    value = value.strip().upper()
+    for suffix, factor in units.items():
+        if value.endswith(suffix):
+            return int(float(value[:-len(suffix)]) * factor)
+    return int(value)
+
+
+def make_text(case, size):
+    """Build an input of roughly `size` characters for a stress case"""
+    if case == "prose":
+        with open(SAMPLE_PATH, encoding="utf-8") as f:
+            unit = f.read() + "\n"
+    elif case == "long_lines":
+        with open(SAMPLE_PATH, encoding="utf-8") as f:
+            unit = f.read().replace("\n", " ") + " "
+    elif case == "giant_word":
+        unit = "handwriting"
+    elif case == "newlines":
+        unit = "\n"
+    elif case == "unsupported":
+        unit = "~#@%^&*|<>{}[] "
+    else:
+        raise ValueError(f"Unknown case: {case}")
+
+    return (unit * (size // len(unit) + 1))[:size]
+
+
+def render_pages(path, text, pool):
+    """Yield rendered page images for one code path"""
+    if path == "first_page":
+        generator = ImprovedHandwritingGenerator(seed=0)
+        yield generator.generate_handwriting(text, WIDTH, HEIGHT, pool=pool, **SETTINGS)
+    elif path == "document":
+        generator = ImprovedHandwritingGenerator(seed=0)
+        yield from generator.generate_pages(text, WIDTH, HEIGHT, pool=pool, **SETTINGS)
+    elif path == "engine":
+        engine = ENGINES["advanced"](seed=0)
+        yield from engine.generate_pages(text, WIDTH, HEIGHT, pool=pool, **SETTINGS)
+    else:
+        raise ValueError(f"Unknown path: {path}")
+
+
+def render_all(path, text):
+    """Render and encode every page, returning (page count, output bytes)"""
+    pool = CanvasPool()
+    output_bytes = 0
+    pages = 0
+
+    for page in render_pages(path, text, pool):
+        buf = io.BytesIO()
+        page.save(buf, format="PNG")
+        pool.release(page)
+        output_bytes += buf.tell()
+        pages += 1
+
+    return pages, output_bytes
+
+
+def run_once(path, case, size, trace_limit):
+    """Render one input in this process and return its measurements
+
+    Wall time and RSS come from an untraced run. tracemalloc slows
+    rendering several times over, so the traced run is repeated only for
+    inputs up to `trace_limit` bytes.
+    """
+    text = make_text(case, size)
+
+    start = time.perf_counter()
+    pages, output_bytes = render_all(path, text)
+    elapsed = time.perf_counter() - start
+
+    peak_traced = None
+    if size <= trace_limit:
+        tracemalloc.start()
+        render_all(path, text)
+        _, peak_traced = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        "seconds": elapsed,
+        "peak_traced": peak_traced,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        "output_bytes": output_bytes,
+        "pages": pages,
+    }
+
+
+def fit_exponent(sizes, seconds):
+    """Least-squares slope of log(time) against log(size)"""
+    xs = [math.log(s) for s in sizes]
+    ys = [math.log(max(t, 1e-6)) for t in seconds]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+
+
+def check_results(path, case, results):
+    """Return a list of failure messages for one path/case sweep"""
+    failures = []
+
+    fitted = [(size, r["seconds"]) for size, r in results if size >= FIT_MIN_SIZE]
+    if len(fitted) >= 2:
+        exponent = fit_exponent(*zip(*fitted))
+        print(f"  time ~ size^{exponent:.2f}")
+        if exponent > MAX_SCALING_EXPONENT:
+            failures.append(f"{path}/{case}: time grows as size^{exponent:.2f}")
+    else:
+        failures.append(f"{path}/{case}: too few sizes to fit a scaling exponent")
+
+    for key, label in [("peak_traced", "traced"), ("peak_rss", "RSS")]:
+        peaks = [r[key] for _, r in results if r[key] is not None]
+        if peaks and max(peaks) > MAX_MEMORY_GROWTH * min(peaks) + MEMORY_SLACK_BYTES:
+            failures.append(
+                f"{path}/{case}: peak {label} memory grew from {min(peaks) / 1e6:.1f} MB "
+                f"to {max(peaks) / 1e6:.1f} MB"
+            )
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Large-document stress harness")
+    parser.add_argument("--max-size", type=parse_size, default=DEFAULT_MAX_SIZE)
+    parser.add_argument("--full", action="store_true",
+                        help="Run every size up to 10 MB (takes hours)")
+    parser.add_argument("--trace-limit", type=parse_size, default=DEFAULT_TRACE_LIMIT,
+                        help="Largest input to re-run under tracemalloc")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--paths", nargs="+", choices=PATHS, default=PATHS)
+    args = parser.parse_args()
+
+    max_size = SIZES[-1] if args.full else args.max_size
+    sizes = [size for size in SIZES if size <= max_size]
+    if sum(size >= FIT_MIN_SIZE for size in sizes) < 2:
+        smallest = [size for size in SIZES if size >= FIT_MIN_SIZE][1]
+        parser.error(f"--max-size must be at least {smallest:,} bytes to check scaling")
+    ctx = multiprocessing.get_context("spawn")
+    failures = []
+
+    for path in args.paths:
+        for case in args.cases:
+            print(f"{path} / {case}")
+            results = []
+            for size in sizes:
+                with ctx.Pool(1) as worker:
+                    r = worker.apply(run_once, (path, case, size, args.trace_limit))
+                results.append((size, r))
+                traced = "      -" if r["peak_traced"] is None else f"{r['peak_traced'] / 1e6:7.1f}"
+                print(
+                    f"  {size:>10,} B  {r['seconds']:8.2f} s  "
+                    f"traced {traced} MB  "
+                    f"RSS {r['peak_rss'] / 1e6:7.1f} MB  "
+                    f"{r['pages']:>6} page(s)  {r['output_bytes'] / 1e6:8.2f} MB out"
+                )
+            failures.extend(check_results(path, case, results))
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+
+    print("\nAll stress cases scale linearly with bounded per-page memory.")
+
+
+if __name__ == "__main__":
+    main()